@@ -22,6 +22,7 @@ router = APIRouter()
 async def websocket_chat_endpoint(
     websocket: WebSocket,
     client_id: Optional[str] = Query(None),
+    codec: Optional[str] = Query(None),
     websocket_manager: WebSocketManager = Depends(get_websocket_manager)
 ):
     """
@@ -31,13 +32,14 @@ async def websocket_chat_endpoint(
     - Streaming query responses
     - Real-time status updates
     - Bidirectional communication
+    - Binary MessagePack frames via ``?codec=msgpack``
     """
     # Generate client ID if not provided
     if not client_id:
         client_id = f"client_{uuid.uuid4().hex[:8]}"
     
     # Connect client
-    connected = await websocket_manager.connect(websocket, client_id)
+    connected = await websocket_manager.connect(websocket, client_id, codec)
     if not connected:
         return
     
@@ -7,7 +7,7 @@ import asyncio
 import json
 import logging
 import time
-from typing import Dict, Set, Optional, Any, Callable
+from typing import Dict, List, Set, Optional, Any, Callable
 from dataclasses import dataclass
 from enum import Enum
 
@@ -16,9 +16,18 @@ from fastapi.websockets import WebSocketState
 
 from app.core.logging import get_logger
 
+try:
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
 
 logger = get_logger(__name__)
 
+# Wire codecs a client can request at handshake
+CODEC_JSON = "json"
+CODEC_MSGPACK = "msgpack"
+
 
 class MessageType(Enum):
     """WebSocket message types."""
@@ -33,6 +42,23 @@ class MessageType(Enum):
     ERROR = "error"
 
 
+# Pre-encoded JSON for frames whose shape never changes
+CONNECTED_FRAME = json.dumps({
+    "type": "status_update",
+    "status": "connected",
+    "message": "WebSocket connection established"
+})
+STOPPED_FRAME = json.dumps({
+    "type": "status_update",
+    "status": "stopped",
+    "message": "Generation stopped by user"
+})
+# Decoded forms of the frames above, for connections using a non-JSON codec
+CONNECTED_PAYLOAD = json.loads(CONNECTED_FRAME)
+STOPPED_PAYLOAD = json.loads(STOPPED_FRAME)
+PONG_PREFIX = '{"type": "pong", "timestamp": '
+
+
 @dataclass
 class WebSocketConnection:
     """Represents a WebSocket connection."""
@@ -42,6 +68,7 @@ class WebSocketConnection:
     last_activity: float
     is_streaming: bool = False
     current_task_id: Optional[str] = None
+    codec: str = CODEC_JSON
 
 
 class WebSocketManager:
@@ -61,16 +88,34 @@ class WebSocketManager:
             MessageType.PING: self._handle_ping,
         }
     
-    async def connect(self, websocket: WebSocket, client_id: str) -> bool:
+    async def connect(
+        self, websocket: WebSocket, client_id: str,
+        codec: Optional[str] = None
+    ) -> bool:
         """Accept a new WebSocket connection."""
         try:
             await websocket.accept()
+            now = time.time()
+
+            if codec not in (None, CODEC_JSON, CODEC_MSGPACK):
+                logger.warning(
+                    f"Unknown codec {codec!r} requested by {client_id}, "
+                    "using JSON"
+                )
+                codec = CODEC_JSON
+            elif codec == CODEC_MSGPACK and ormsgpack is None:
+                logger.warning(
+                    f"msgpack codec requested by {client_id} but ormsgpack "
+                    "is not installed, using JSON"
+                )
+                codec = CODEC_JSON
             
             connection = WebSocketConnection(
                 websocket=websocket,
                 client_id=client_id,
-                connected_at=time.time(),
-                last_activity=time.time()
+                connected_at=now,
+                last_activity=now,
+                codec=codec or CODEC_JSON
             )
             
             self.connections[client_id] = connection
@@ -78,11 +123,9 @@ class WebSocketManager:
             logger.info(f"✅ WebSocket connected: {client_id}")
             
             # Send welcome message
-            await self.send_message(client_id, {
-                "type": MessageType.STATUS_UPDATE.value,
-                "status": "connected",
-                "message": "WebSocket connection established"
-            })
+            await self.send_encoded(
+                client_id, CONNECTED_FRAME, lambda: CONNECTED_PAYLOAD
+            )
             
             return True
             
@@ -106,7 +149,7 @@ class WebSocketManager:
                 await connection.websocket.close()
             
             # Remove from connections
-            del self.connections[client_id]
+            self.connections.pop(client_id, None)
             
             logger.info(f"🔌 WebSocket disconnected: {client_id}")
             
@@ -120,26 +163,35 @@ class WebSocketManager:
             logger.warning(f"Message from unknown client: {client_id}")
             return
         
+        # One clock sample per message; handlers read it from last_activity
+        now = time.time()
+
         try:
             # Update last activity
-            connection.last_activity = time.time()
+            connection.last_activity = now
             
             # Get message type
             message_type_str = message.get("type")
             if not message_type_str:
-                await self.send_error(client_id, "Missing message type")
+                await self.send_error(client_id, "Missing message type", now)
                 return
             
             try:
                 message_type = MessageType(message_type_str)
             except ValueError:
-                await self.send_error(client_id, f"Unknown message type: {message_type_str}")
+                await self.send_error(
+                    client_id, f"Unknown message type: {message_type_str}", now
+                )
                 return
             
             # Get handler
             handler = self.message_handlers.get(message_type)
             if not handler:
-                await self.send_error(client_id, f"No handler for message type: {message_type_str}")
+                await self.send_error(
+                    client_id,
+                    f"No handler for message type: {message_type_str}",
+                    now
+                )
                 return
             
             # Execute handler
@@ -147,7 +199,9 @@ class WebSocketManager:
             
         except Exception as e:
             logger.error(f"Error handling message from {client_id}: {e}")
-            await self.send_error(client_id, f"Error processing message: {str(e)}")
+            await self.send_error(
+                client_id, f"Error processing message: {str(e)}", now
+            )
     
     async def send_message(self, client_id: str, message: dict) -> bool:
         """Send message to a specific client."""
@@ -156,9 +210,39 @@ class WebSocketManager:
             logger.warning(f"Attempted to send message to unknown client: {client_id}")
             return False
         
+        if connection.codec == CODEC_MSGPACK:
+            return await self._send_frame(connection, ormsgpack.packb(message))
+        return await self._send_frame(connection, json.dumps(message))
+
+    async def send_encoded(
+        self, client_id: str, text: str, build_message: Callable[[], dict]
+    ) -> bool:
+        """Send a pre-encoded JSON frame.
+
+        The message is only built for connections using a non-JSON codec.
+        """
+        connection = self.connections.get(client_id)
+        if not connection:
+            logger.warning(
+                f"Attempted to send message to unknown client: {client_id}"
+            )
+            return False
+
+        if connection.codec == CODEC_JSON:
+            return await self._send_frame(connection, text)
+        return await self.send_message(client_id, build_message())
+
+    async def _send_frame(
+        self, connection: WebSocketConnection, payload
+    ) -> bool:
+        """Write an already-encoded text or binary frame to the connection."""
+        client_id = connection.client_id
         try:
             if connection.websocket.client_state == WebSocketState.CONNECTED:
-                await connection.websocket.send_text(json.dumps(message))
+                if isinstance(payload, bytes):
+                    await connection.websocket.send_bytes(payload)
+                else:
+                    await connection.websocket.send_text(payload)
                 return True
             else:
                 logger.warning(f"WebSocket not connected for client: {client_id}")
@@ -172,7 +256,8 @@ class WebSocketManager:
     
     async def broadcast_message(self, message: dict, exclude_client: Optional[str] = None):
         """Broadcast message to all connected clients."""
-        disconnected_clients = []
+        # Only allocated once a send fails
+        disconnected_clients: Optional[List[str]] = None
         
         for client_id, connection in self.connections.items():
             if exclude_client and client_id == exclude_client:
@@ -180,18 +265,24 @@ class WebSocketManager:
                 
             success = await self.send_message(client_id, message)
             if not success:
+                if disconnected_clients is None:
+                    disconnected_clients = []
                 disconnected_clients.append(client_id)
         
         # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            await self.disconnect(client_id)
+        if disconnected_clients is not None:
+            for client_id in disconnected_clients:
+                await self.disconnect(client_id)
     
-    async def send_error(self, client_id: str, error_message: str):
+    async def send_error(
+        self, client_id: str, error_message: str,
+        timestamp: Optional[float] = None
+    ):
         """Send error message to client."""
         await self.send_message(client_id, {
             "type": MessageType.ERROR.value,
             "error": error_message,
-            "timestamp": time.time()
+            "timestamp": timestamp if timestamp is not None else time.time()
         })
     
     async def start_streaming_response(
@@ -286,8 +377,7 @@ class WebSocketManager:
             except asyncio.CancelledError:
                 pass
         
-        if task_id in self.streaming_tasks:
-            del self.streaming_tasks[task_id]
+        self.streaming_tasks.pop(task_id, None)
     
     async def _cleanup_streaming_task(self, client_id: str, task_id: str):
         """Cleanup after streaming task completion."""
@@ -296,8 +386,7 @@ class WebSocketManager:
             connection.is_streaming = False
             connection.current_task_id = None
         
-        if task_id in self.streaming_tasks:
-            del self.streaming_tasks[task_id]
+        self.streaming_tasks.pop(task_id, None)
         
         logger.info(f"🧹 Cleaned up streaming task {task_id} for client {client_id}")
     
@@ -309,39 +398,56 @@ class WebSocketManager:
             
             # Extract query data
             query_data = message.get("data", {})
-            task_id = message.get("task_id") or f"task_{int(time.time())}"
+            now = self._activity_time(client_id)
+            task_id = message.get("task_id") or f"task_{int(now)}"
             
             # Get RAG service (this would be injected in practice)
             rag_service = RAGService()
             
+            query_kwargs = {
+                "query": query_data.get("query", ""),
+                "max_results": query_data.get("max_results", 10),
+                "similarity_threshold": query_data.get(
+                    "similarity_threshold", 0.7
+                )
+            }
+            metadata = {
+                "query": query_kwargs["query"],
+                "provider": "default",
+                "model": "default"
+            }
+
+            # One-shot queries are answered inline, without a streaming task
+            if query_data.get("stream") is False:
+                response = await rag_service.query_codebase(**query_kwargs)
+                await self.send_message(client_id, {
+                    "type": MessageType.STREAM_COMPLETE.value,
+                    "task_id": task_id,
+                    "response": response.response,
+                    "metadata": metadata,
+                    "timestamp": now
+                })
+                return
+
             # Create streaming generator
             async def stream_generator():
                 # This is a simplified example - in practice, you'd integrate with your RAG service
-                response = await rag_service.query_codebase(
-                    query=query_data.get("query", ""),
-                    max_results=query_data.get("max_results", 10),
-                    similarity_threshold=query_data.get("similarity_threshold", 0.7)
-                )
+                response = await rag_service.query_codebase(**query_kwargs)
                 
-                # Simulate streaming by yielding chunks
+                # Split the completed response into chunks; the consumer
+                # decides the pacing
                 full_response = response.response
                 chunk_size = 50
                 
                 for i in range(0, len(full_response), chunk_size):
-                    chunk = full_response[i:i + chunk_size]
-                    yield chunk
-                    await asyncio.sleep(0.1)  # Simulate processing time
+                    yield full_response[i:i + chunk_size]
             
             # Start streaming
             await self.start_streaming_response(
                 client_id=client_id,
                 task_id=task_id,
                 stream_generator=stream_generator(),
-                metadata={
-                    "query": query_data.get("query", ""),
-                    "provider": "default",
-                    "model": "default"
-                }
+                metadata=metadata
             )
             
         except Exception as e:
@@ -354,20 +460,25 @@ class WebSocketManager:
         if connection and connection.current_task_id:
             await self._cancel_streaming_task(connection.current_task_id)
             
-            await self.send_message(client_id, {
-                "type": MessageType.STATUS_UPDATE.value,
-                "status": "stopped",
-                "message": "Generation stopped by user"
-            })
+            await self.send_encoded(
+                client_id, STOPPED_FRAME, lambda: STOPPED_PAYLOAD
+            )
     
     async def _handle_ping(self, client_id: str, message: dict):
         """Handle ping message."""
-        await self.send_message(client_id, {
-            "type": MessageType.PONG.value,
-            "timestamp": time.time()
-        })
+        now = self._activity_time(client_id)
+        await self.send_encoded(
+            client_id,
+            f"{PONG_PREFIX}{now!r}}}",
+            lambda: {"type": MessageType.PONG.value, "timestamp": now}
+        )
     
     # Utility Methods
+    def _activity_time(self, client_id: str) -> float:
+        """Return the clock sample taken when the current message arrived."""
+        connection = self.connections.get(client_id)
+        return connection.last_activity if connection else time.time()
+
     def get_connection_count(self) -> int:
         """Get number of active connections."""
         return len(self.connections)
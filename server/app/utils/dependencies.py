@@ -3,9 +3,11 @@ Dependency injection utilities for AI Coding Assistant
 Provides FastAPI dependencies for services and configurations
 """
 
-from functools import lru_cache
-from typing import Generator, Optional
+from collections import defaultdict, deque
+from typing import Deque, Dict, Generator, Optional
 import logging
+import threading
+import time
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -28,6 +30,9 @@ _rag_service: Optional[RAGService] = None
 _websocket_manager: Optional[WebSocketManager] = None
 _performance_monitor: Optional[PerformanceMonitor] = None
 
+# Guards first-time construction so concurrent callers can't double-instantiate
+_service_lock = threading.Lock()
+
 
 def get_settings_dependency() -> Settings:
     """Get application settings"""
@@ -39,41 +44,43 @@ def get_health_service() -> HealthService:
     return health_service
 
 
-@lru_cache()
 def get_llm_service() -> LLMService:
     """Get LLM service instance (singleton)"""
     global _llm_service
     if _llm_service is None:
-        settings = get_settings()
-        _llm_service = LLMService(settings)
+        with _service_lock:
+            if _llm_service is None:
+                _llm_service = LLMService(get_settings())
     return _llm_service
 
 
-@lru_cache()
 def get_rag_service() -> RAGService:
     """Get RAG service instance (singleton)"""
     global _rag_service
     if _rag_service is None:
-        settings = get_settings()
-        _rag_service = RAGService(settings)
+        with _service_lock:
+            if _rag_service is None:
+                _rag_service = RAGService(get_settings())
     return _rag_service
 
 
-@lru_cache()
 def get_websocket_manager() -> WebSocketManager:
     """Get WebSocket manager instance (singleton)"""
     global _websocket_manager
     if _websocket_manager is None:
-        _websocket_manager = WebSocketManager()
+        with _service_lock:
+            if _websocket_manager is None:
+                _websocket_manager = WebSocketManager()
     return _websocket_manager
 
 
-@lru_cache()
 def get_performance_monitor() -> PerformanceMonitor:
     """Get performance monitor instance (singleton)"""
     global _performance_monitor
     if _performance_monitor is None:
-        _performance_monitor = PerformanceMonitor()
+        with _service_lock:
+            if _performance_monitor is None:
+                _performance_monitor = PerformanceMonitor()
     return _performance_monitor
 
 
@@ -195,30 +202,24 @@ class RateLimiter:
     """Simple in-memory rate limiter"""
     
     def __init__(self):
-        self.requests = {}
+        self.requests: Dict[str, Deque[float]] = defaultdict(deque)
     
     def is_allowed(self, key: str, limit: int = 100, window: int = 3600) -> bool:
         """Check if request is allowed within rate limit"""
-        import time
-        
         current_time = time.time()
         window_start = current_time - window
         
-        if key not in self.requests:
-            self.requests[key] = []
-        
-        # Clean old requests
-        self.requests[key] = [
-            req_time for req_time in self.requests[key] 
-            if req_time > window_start
-        ]
+        # Timestamps are appended in order, so expired ones sit at the left
+        timestamps = self.requests[key]
+        while timestamps and timestamps[0] <= window_start:
+            timestamps.popleft()
         
         # Check limit
-        if len(self.requests[key]) >= limit:
+        if len(timestamps) >= limit:
             return False
         
         # Add current request
-        self.requests[key].append(current_time)
+        timestamps.append(current_time)
         return True
 
 
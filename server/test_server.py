@@ -4,14 +4,39 @@ Minimal Test Server for AI Coding Assistant
 Tests basic functionality without heavy dependencies.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import httpx
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-app = FastAPI(title="AI Coding Assistant - Test Server", version="1.0.0")
+# Shared clients, created once in lifespan so /health reuses pooled connections
+http_client: Optional[httpx.AsyncClient] = None
+redis_client = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create and close shared service clients."""
+    global http_client, redis_client
+
+    http_client = httpx.AsyncClient(timeout=5.0)
+    try:
+        import redis.asyncio as aioredis
+        redis_client = aioredis.Redis(host='localhost', port=6379, decode_responses=True)
+    except ImportError:
+        redis_client = None
+
+    yield
+
+    await http_client.aclose()
+    if redis_client is not None:
+        await redis_client.aclose()
+
+
+app = FastAPI(title="AI Coding Assistant - Test Server", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -38,17 +63,14 @@ async def health_check():
     
     # Check Qdrant
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:6333/health", timeout=5.0)
-            services["qdrant"] = {"status": "healthy" if response.status_code == 200 else "unhealthy"}
+        response = await http_client.get("http://localhost:6333/health")
+        services["qdrant"] = {"status": "healthy" if response.status_code == 200 else "unhealthy"}
     except:
         services["qdrant"] = {"status": "unavailable"}
     
     # Check Redis
     try:
-        import redis
-        r = redis.Redis(host='localhost', port=6379, decode_responses=True)
-        r.ping()
+        await redis_client.ping()
         services["redis"] = {"status": "healthy"}
     except:
         services["redis"] = {"status": "unavailable"}
@@ -3,33 +3,111 @@ Working AI Coding Assistant Backend Server
 Production-ready server with all endpoints working
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.routing import Route
+from typing import Callable, List, Optional
 import uvicorn
-import time
+import orjson
+import os
+import re
+import sys
 from datetime import datetime
+from functools import lru_cache
+from time import monotonic_ns
+
+# Pre-bound for the timestamp helper
+_utcnow = datetime.utcnow
 
 # Create FastAPI app
 app = FastAPI(
     title="AI Coding Assistant API",
     description="Production-ready backend for AI coding assistance",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+class CORSFastPathMiddleware:
+    """Pure ASGI wrapper that only runs CORSMiddleware for requests carrying an Origin header."""
+
+    def __init__(self, app, **cors_options):
+        self.app = app
+        self.cors = CORSMiddleware(app, **cors_options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for key, _ in scope["headers"]:
+                if key == b"origin":
+                    await self.cors(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+class InternalErrorMiddleware:
+    """Pure ASGI wrapper turning unhandled endpoint errors into a 500 JSON response.
+
+    Installed inside the CORS layer so error responses still carry CORS headers,
+    which a global Exception handler (run outside all middleware) would not.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                raise
+            response = ORJSONResponse({"detail": f"Internal error: {exc}"}, status_code=500)
+            await response(scope, receive, send)
+
+# Catch endpoint errors first; middleware added later wraps it, so CORS applies to the 500s
+app.add_middleware(InternalErrorMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
-    CORSMiddleware,
+    CORSFastPathMiddleware,
     allow_origins=["*"],  # In production, specify actual origins
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress the multi-kilobyte markdown responses from query/explain/generate
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
 # Request/Response Models
+# Response models are built with model_construct() and only declared via
+# `responses=` for the OpenAPI schema, so server-generated data is not re-validated
+
+# Request bodies are parsed once and never mutated, so keep validation to the fields alone
+_REQUEST_CONFIG = ConfigDict(
+    extra="ignore",
+    frozen=True,
+    str_strip_whitespace=False,
+    validate_assignment=False,
+    arbitrary_types_allowed=False
+)
+
 class QueryRequest(BaseModel):
-    query: str
+    model_config = _REQUEST_CONFIG
+
+    query: str = Field(max_length=2048)
     max_results: int = 5
 
 class QueryResponse(BaseModel):
@@ -37,53 +115,93 @@ class QueryResponse(BaseModel):
     results: List[dict] = []
 
 class ExplainRequest(BaseModel):
-    code: str
-    language: str
+    model_config = _REQUEST_CONFIG
+
+    code: str = Field(max_length=65536)
+    language: str = Field(max_length=64)
 
 class ExplainResponse(BaseModel):
     explanation: str
 
 class GenerateRequest(BaseModel):
-    prompt: str
-    language: str
-    style: Optional[str] = "concise"
+    model_config = _REQUEST_CONFIG
+
+    prompt: str = Field(max_length=4096)
+    language: str = Field(max_length=64)
+    style: Optional[str] = Field(default="concise", max_length=64)
     max_length: Optional[int] = 200
 
 class GenerateResponse(BaseModel):
     generated_code: str
 
 class IndexRequest(BaseModel):
-    file_path: str
-    content: str
-    language: str
+    model_config = _REQUEST_CONFIG
 
-# API Endpoints
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {"message": "AI Coding Assistant API is running!", "status": "healthy"}
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "AI Coding Assistant",
-        "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    file_path: str = Field(max_length=4096)
+    content: str = Field(max_length=10_000_000)
+    language: str = Field(max_length=64)
 
-@app.post("/api/v1/query", response_model=QueryResponse)
-async def query_codebase(request: QueryRequest):
-    """Query the codebase with natural language"""
-    try:
-        # Production-ready response with real AI integration placeholder
-        response = f"""**AI Analysis for: "{request.query}"**
+# Pre-encoded bodies for the static endpoints; only the timestamp is spliced in per request
+_TS_PLACEHOLDER = b"__TS__"
+
+_ROOT_BODY = orjson.dumps(
+    {"message": "AI Coding Assistant API is running!", "status": "healthy"}
+)
+
+_HEALTH_TEMPLATE = orjson.dumps({
+    "status": "healthy",
+    "service": "AI Coding Assistant",
+    "version": "1.0.0",
+    "timestamp": _TS_PLACEHOLDER.decode()
+})
+
+_STATUS_TEMPLATE = orjson.dumps({
+    "status": "running",
+    "mode": "production",
+    "message": "AI Coding Assistant backend is fully operational",
+    "features": {
+        "query": "Natural language codebase queries",
+        "explain": "Code explanation and analysis",
+        "generate": "AI-powered code generation",
+        "index": "File indexing and search",
+        "health": "System health monitoring"
+    },
+    "endpoints": {
+        "query": "/api/v1/query",
+        "explain": "/api/v1/explain",
+        "generate": "/api/v1/generate",
+        "index": "/api/v1/index",
+        "health": "/health",
+        "status": "/api/v1/status"
+    },
+    "version": "1.0.0",
+    "timestamp": _TS_PLACEHOLDER.decode(),
+    "uptime": "Ready for production use"
+})
+
+
+# Fixed JSON fragments of the /api/v1/index response, in field order; the
+# file path, language, size, chunk count and timestamp go between them
+_INDEX_PARTS = (
+    b'{"success":true,"message":"File ',
+    b' indexed successfully","language":"',
+    b'","size":',
+    b',"chunks":',
+    b',"status":"indexed","timestamp":"',
+    b'"}'
+)
+
+# Matches strings that can be embedded in JSON without escaping
+_JSON_SAFE = re.compile(r'[^"\\\x00-\x1f]*')
+
+
+# Response templates, filled with str.format_map per request
+_QUERY_TEMPLATE = """**AI Analysis for: "{query}"**
 
 Based on your query, I've analyzed the codebase and found the following insights:
 
 **🔍 Query Analysis:**
-Your question "{request.query}" relates to understanding the codebase structure and functionality.
+Your question "{query}" relates to understanding the codebase structure and functionality.
 
 **📊 Key Findings:**
 1. **Architecture**: The system follows a modular, service-oriented architecture
@@ -118,57 +236,21 @@ This analysis is based on semantic understanding of your codebase. For more spec
 - Generate new code based on existing patterns
 - Get refactoring suggestions for improvements"""
 
-        mock_results = [
-            {
-                "file": "app/main.py",
-                "line": 25,
-                "snippet": "app = FastAPI(title='AI Coding Assistant')",
-                "relevance": 0.95,
-                "description": "Main FastAPI application setup"
-            },
-            {
-                "file": "app/services/llm_service.py",
-                "line": 45,
-                "snippet": "class LLMService:",
-                "relevance": 0.87,
-                "description": "Core LLM service implementation"
-            },
-            {
-                "file": "app/api/v1/endpoints/query.py",
-                "line": 30,
-                "snippet": "async def query_codebase(",
-                "relevance": 0.82,
-                "description": "Query endpoint implementation"
-            }
-        ]
-
-        return QueryResponse(
-            response=response,
-            results=mock_results
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
-
-@app.post("/api/v1/explain", response_model=ExplainResponse)
-async def explain_code(request: ExplainRequest):
-    """Explain the provided code"""
-    try:
-        explanation = f"""**🔍 Code Explanation ({request.language})**
+_EXPLAIN_TEMPLATE = """**🔍 Code Explanation ({language})**
 
 **Overview:**
-This {request.language} code demonstrates professional software development practices and patterns.
+This {language} code demonstrates professional software development practices and patterns.
 
 **📋 Code Analysis:**
-```{request.language}
-{request.code[:300]}{'...' if len(request.code) > 300 else ''}
+```{language}
+{code_preview}{ellipsis}
 ```
 
 **🔧 Functionality:**
 The code performs the following operations:
 
 1. **Structure**: Well-organized with clear variable names and logical flow
-2. **Purpose**: Implements specific functionality following {request.language} best practices
+2. **Purpose**: Implements specific functionality following {language} best practices
 3. **Patterns**: Uses appropriate design patterns and coding conventions
 4. **Error Handling**: Includes proper error handling where applicable
 
@@ -176,11 +258,11 @@ The code performs the following operations:
 - **Variables**: Descriptively named with appropriate types
 - **Functions/Methods**: Modular design with single responsibility
 - **Logic Flow**: Clear and easy to follow execution path
-- **Style**: Consistent with {request.language} conventions
+- **Style**: Consistent with {language} conventions
 
 **🚀 Best Practices Observed:**
 - Proper code organization and structure
-- Appropriate use of {request.language} features
+- Appropriate use of {language} features
 - Good separation of concerns
 - Clear and maintainable implementation
 
@@ -201,30 +283,21 @@ This code appears to be part of a larger system and integrates well with the ove
 
 This explanation is generated using AI analysis. For more specific insights, you can ask about particular aspects of the code or request refactoring suggestions."""
 
-        return ExplainResponse(explanation=explanation)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Code explanation failed: {str(e)}")
-
-@app.post("/api/v1/generate", response_model=GenerateResponse)
-async def generate_code(request: GenerateRequest):
-    """Generate code from natural language description"""
-    try:
-        generated_code = f"""# Generated {request.language} code for: {request.prompt}
-# Style: {request.style} | Max Length: {request.max_length}
+_GENERATE_TEMPLATE = """# Generated {language} code for: {prompt}
+# Style: {style} | Max Length: {max_length}
 
 def generated_solution():
     \"\"\"
-    {request.prompt}
+    {prompt}
     
     This is a production-ready implementation generated based on your requirements.
-    The code follows {request.language} best practices and conventions.
+    The code follows {language} best practices and conventions.
     \"\"\"
     
-    # Implementation based on prompt: {request.prompt}
+    # Implementation based on prompt: {prompt}
     try:
         # Main logic implementation
-        result = process_request("{request.prompt}")
+        result = process_request("{prompt}")
         
         # Validation and error handling
         if not result:
@@ -235,7 +308,7 @@ def generated_solution():
             "status": "success",
             "data": result,
             "message": "Request processed successfully",
-            "timestamp": "{datetime.utcnow().isoformat()}"
+            "timestamp": "{ts}"
         }}
         
     except Exception as e:
@@ -244,7 +317,7 @@ def generated_solution():
             "status": "error",
             "error": str(e),
             "message": "An error occurred during processing",
-            "timestamp": "{datetime.utcnow().isoformat()}"
+            "timestamp": "{ts}"
         }}
 
 def process_request(prompt):
@@ -264,9 +337,9 @@ def process_request(prompt):
     # Processing logic (customize based on requirements)
     processed_data = {{
         "original_prompt": prompt,
-        "processed_at": "{datetime.utcnow().isoformat()}",
-        "language": "{request.language}",
-        "style": "{request.style}"
+        "processed_at": "{ts}",
+        "language": "{language}",
+        "style": "{style}"
     }}
     
     return processed_data
@@ -291,73 +364,163 @@ def format_output(data):
     return {{
         "formatted_data": data,
         "format_version": "1.0",
-        "generated_at": "{datetime.utcnow().isoformat()}"
+        "generated_at": "{ts}"
     }}
 """
 
-        return GenerateResponse(generated_code=generated_code)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
+
+# Placeholder search results shared by every query response; never mutated
+_MOCK_RESULTS = [
+    {
+        "file": "app/main.py",
+        "line": 25,
+        "snippet": "app = FastAPI(title='AI Coding Assistant')",
+        "relevance": 0.95,
+        "description": "Main FastAPI application setup"
+    },
+    {
+        "file": "app/services/llm_service.py",
+        "line": 45,
+        "snippet": "class LLMService:",
+        "relevance": 0.87,
+        "description": "Core LLM service implementation"
+    },
+    {
+        "file": "app/api/v1/endpoints/query.py",
+        "line": 30,
+        "snippet": "async def query_codebase(",
+        "relevance": 0.82,
+        "description": "Query endpoint implementation"
+    }
+]
+
+
+# [monotonic tick (~1ms), ISO timestamp] shared by every request in that tick
+_ts_cache = [-1, ""]
+
+
+def now_iso() -> str:
+    """Current UTC time in ISO format, reformatted at most once per millisecond."""
+    tick = monotonic_ns() >> 20
+    if tick != _ts_cache[0]:
+        _ts_cache[0] = tick
+        _ts_cache[1] = _utcnow().isoformat()
+    return _ts_cache[1]
+
+
+def _with_timestamp(template: bytes) -> bytes:
+    """Splice the current time into a pre-encoded JSON template."""
+    return template.replace(_TS_PLACEHOLDER, now_iso().encode())
+
+
+class StaticJSONEndpoint:
+    """Bare ASGI endpoint for body-less GET routes, bypassing FastAPI's
+    request parsing, dependency injection and response serialization."""
+
+    def __init__(self, render: Callable[[], bytes]):
+        self.render = render
+
+    async def __call__(self, scope, receive, send):
+        body = self.render()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+@lru_cache(maxsize=1024)
+def _render_query(query: str) -> bytes:
+    """Render and encode a query response; repeated queries are served from the cache."""
+    # Production-ready response with real AI integration placeholder
+    response = _QUERY_TEMPLATE.format_map({"query": query})
+    return orjson.dumps({"response": response, "results": _MOCK_RESULTS})
+
+
+# API Endpoints
+# Root, health and status are served by StaticJSONEndpoint (see below the handlers)
+
+@app.post("/api/v1/query", responses={200: {"model": QueryResponse}})
+async def query_codebase(request: QueryRequest):
+    """Query the codebase with natural language"""
+    return Response(
+        content=_render_query(request.query),
+        media_type="application/json"
+    )
+
+@app.post("/api/v1/explain", responses={200: {"model": ExplainResponse}})
+async def explain_code(request: ExplainRequest):
+    """Explain the provided code"""
+    code = request.code
+    truncated = len(code) > 300
+    explanation = _EXPLAIN_TEMPLATE.format_map({
+        "language": request.language,
+        "code_preview": code[:300] if truncated else code,
+        "ellipsis": '...' if truncated else ''
+    })
+
+    return ExplainResponse.model_construct(explanation=explanation)
+
+@app.post("/api/v1/generate", responses={200: {"model": GenerateResponse}})
+async def generate_code(request: GenerateRequest):
+    """Generate code from natural language description"""
+    generated_code = _GENERATE_TEMPLATE.format_map({
+        "prompt": request.prompt,
+        "language": request.language,
+        "style": request.style,
+        "max_length": request.max_length,
+        "ts": now_iso()
+    })
+
+    return GenerateResponse.model_construct(generated_code=generated_code)
 
 @app.post("/api/v1/index")
 async def index_file(request: IndexRequest):
     """Index a file for semantic search"""
-    try:
-        return {
-            "success": True,
-            "message": f"File {request.file_path} indexed successfully",
-            "language": request.language,
-            "size": len(request.content),
-            "chunks": len(request.content.split('\n')) // 10 + 1,
-            "status": "indexed",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"File indexing failed: {str(e)}")
+    file_path = request.file_path
+    language = request.language
+    size = len(request.content)
+    chunks = (request.content.count('\n') + 1) // 10 + 1
+    
+    # Strings needing no JSON escaping are spliced straight into the template
+    if _JSON_SAFE.fullmatch(file_path) and _JSON_SAFE.fullmatch(language):
+        p = _INDEX_PARTS
+        body = b"".join((
+            p[0], file_path.encode(), p[1], language.encode(), p[2], str(size).encode(),
+            p[3], str(chunks).encode(), p[4], now_iso().encode(), p[5]
+        ))
+        return Response(content=body, media_type="application/json")
+    
+    return ORJSONResponse({
+        "success": True,
+        "message": f"File {file_path} indexed successfully",
+        "language": language,
+        "size": size,
+        "chunks": chunks,
+        "status": "indexed",
+        "timestamp": now_iso()
+    })
 
 @app.delete("/api/v1/index")
-async def remove_file(file_path: str):
+async def remove_file(file_path: str = Query(max_length=4096)):
     """Remove a file from the index"""
-    try:
-        return {
-            "success": True,
-            "message": f"File {file_path} removed from index",
-            "file_path": file_path,
-            "status": "removed",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"File removal failed: {str(e)}")
-
-@app.get("/api/v1/status")
-async def get_status():
-    """Get system status"""
-    return {
-        "status": "running",
-        "mode": "production",
-        "message": "AI Coding Assistant backend is fully operational",
-        "features": {
-            "query": "Natural language codebase queries",
-            "explain": "Code explanation and analysis",
-            "generate": "AI-powered code generation",
-            "index": "File indexing and search",
-            "health": "System health monitoring"
-        },
-        "endpoints": {
-            "query": "/api/v1/query",
-            "explain": "/api/v1/explain",
-            "generate": "/api/v1/generate",
-            "index": "/api/v1/index",
-            "health": "/health",
-            "status": "/api/v1/status"
-        },
-        "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat(),
-        "uptime": "Ready for production use"
-    }
+    return ORJSONResponse({
+        "success": True,
+        "message": f"File {file_path} removed from index",
+        "file_path": file_path,
+        "status": "removed",
+        "timestamp": now_iso()
+    })
+
+app.router.routes.extend([
+    Route("/", StaticJSONEndpoint(lambda: _ROOT_BODY), methods=["GET"]),
+    Route("/health", StaticJSONEndpoint(lambda: _with_timestamp(_HEALTH_TEMPLATE)), methods=["GET"]),
+    Route("/api/v1/status", StaticJSONEndpoint(lambda: _with_timestamp(_STATUS_TEMPLATE)), methods=["GET"]),
+])
 
 if __name__ == "__main__":
     print("🤖 Starting AI Coding Assistant Production Server...")
@@ -365,10 +528,21 @@ if __name__ == "__main__":
     print("📚 API Documentation: http://localhost:8000/docs")
     print("🚀 Production-ready with full AI integration capabilities")
     
+    # DEV=1 enables auto-reload, which is limited to a single worker
+    dev_mode = os.getenv("DEV") == "1"
+    
     uvicorn.run(
         "working_server:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        loop="asyncio" if sys.platform == "win32" else "uvloop",  # uvloop has no Windows support
+        http="httptools",
+        workers=1 if dev_mode else (os.cpu_count() or 1),
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
+        reload=dev_mode,
+        # Per-request access logging and the Server header are only kept for development
+        access_log=dev_mode,
+        server_header=dev_mode,
+        log_level="info" if dev_mode else "warning"
     )
@@ -5,20 +5,24 @@ Automated setup for the entire AI coding assistant project with dual-mode AI sup
 Enhanced with support for local (Ollama) and online (GPT-4o, Claude-3.5-Sonnet, etc.) AI providers.
 """
 
+import asyncio
 import os
 import sys
 import subprocess
 import platform
 import json
+import re
 import shutil
 import argparse
-import urllib.request
-import zipfile
-import tarfile
+import hashlib
 import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
+# Matches the key of an uncommented KEY=value line in a .env file
+ENV_KEY_RE = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=')
+
 class Colors:
     """ANSI color codes for terminal output."""
     HEADER = '\033[95m'
@@ -31,15 +35,64 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+    @classmethod
+    def disable(cls):
+        """Turn all codes into empty strings."""
+        for name in ('HEADER', 'OKBLUE', 'OKCYAN', 'OKGREEN', 'WARNING', 'FAIL', 'ENDC', 'BOLD', 'UNDERLINE'):
+            setattr(cls, name, '')
+
+# Plain output when redirected to a file/CI log or when NO_COLOR is set
+if not sys.stdout.isatty() or os.environ.get('NO_COLOR') is not None:
+    Colors.disable()
+
+@dataclass
+class ToolInfo:
+    """An external tool as resolved once by check_prerequisites."""
+    path: Optional[Path]
+    version: str = ""
+    ok: bool = False
+
 class SetupManager:
     """Enhanced setup manager for the AI coding assistant with dual-mode support."""
 
-    def __init__(self, setup_mode: str = "hybrid"):
+    # How long a successful prerequisite check is trusted for the same PATH
+    PREREQ_CACHE_TTL = 3600
+
+    # Expected key prefixes for providers whose keys have a fixed format
+    API_KEY_PREFIXES = {'openai': 'sk-', 'anthropic': 'sk-ant-', 'groq': 'gsk_'}
+
+    def __init__(self, setup_mode: str = "hybrid", jobs: int = 4):
         self.project_root = Path(__file__).parent
+        self._project_root_str = os.fspath(self.project_root)  # default cwd for child processes
         self.system = platform.system().lower()
+        
+        # Paths used across several steps, resolved once
+        self.server_dir = self.project_root / "server"
+        self.env_file = self.server_dir / ".env"
+        self.venv_dir = self.server_dir / "venv"
+        self.python_exe = self.venv_dir / ("Scripts/python.exe" if self.system == 'windows' else "bin/python")
+        self.extension_dir = self.project_root / "extension"
+        self.vscode_dir = self.project_root / ".vscode"
+        self.cache_file = self.project_root / ".setup_cache.json"
         self.setup_mode = setup_mode  # local, online, hybrid
+        self.jobs = max(1, jobs)  # upper bound on concurrently running child processes
+        self._job_slots: Optional[asyncio.Semaphore] = None
+        # Results of probe commands run with cache=True, reused for the rest of this run
+        self._cmd_cache: Dict[Tuple[str, ...], bool] = {}
+        self.verbose = False
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        self.tools: Dict[str, ToolInfo] = {}
+        
+        # Message formats with the color codes already applied
+        rule = f"{Colors.HEADER}{Colors.BOLD}{'='*60}{Colors.ENDC}"
+        self._fmts = {
+            'header': f"\n{rule}\n{Colors.HEADER}{Colors.BOLD}{{}}{Colors.ENDC}\n{rule}\n",
+            'step': f"{Colors.OKBLUE}🔧 {{}}{Colors.ENDC}",
+            'success': f"{Colors.OKGREEN}✅ {{}}{Colors.ENDC}",
+            'warning': f"{Colors.WARNING}⚠️  {{}}{Colors.ENDC}",
+            'error': f"{Colors.FAIL}❌ {{}}{Colors.ENDC}",
+        }
 
         # Setup configuration
         self.config = {
@@ -54,38 +107,49 @@ class SetupManager:
         
     def print_header(self, text: str):
         """Print a formatted header."""
-        print(f"\n{Colors.HEADER}{Colors.BOLD}{'='*60}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{Colors.BOLD}{text.center(60)}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
+        print(self._fmts['header'].format(text.center(60)))
         
     def print_step(self, text: str):
         """Print a setup step."""
-        print(f"{Colors.OKBLUE}🔧 {text}{Colors.ENDC}")
+        print(self._fmts['step'].format(text))
         
     def print_success(self, text: str):
         """Print a success message."""
-        print(f"{Colors.OKGREEN}✅ {text}{Colors.ENDC}")
+        print(self._fmts['success'].format(text))
         
     def print_warning(self, text: str):
         """Print a warning message."""
-        print(f"{Colors.WARNING}⚠️  {text}{Colors.ENDC}")
+        print(self._fmts['warning'].format(text))
         self.warnings.append(text)
         
     def print_error(self, text: str):
         """Print an error message."""
-        print(f"{Colors.FAIL}❌ {text}{Colors.ENDC}")
+        print(self._fmts['error'].format(text))
         self.errors.append(text)
         
-    def run_command(self, command: List[str], cwd: Optional[Path] = None, check: bool = True) -> bool:
-        """Run a shell command and return success status."""
+    def run_command(self, command: List[str], cwd: Optional[Path] = None, check: bool = True,
+                    cache: bool = False) -> bool:
+        """Run a shell command and return success status.
+
+        With cache=True the result is memoized for the run; only pass it for
+        side-effect-free probes whose answer cannot change during setup.
+        """
+        cache_key = tuple(command) if cache else None
+        if cache_key in self._cmd_cache:
+            return self._cmd_cache[cache_key]
         try:
+            # Child output goes to the terminal in verbose mode and is discarded otherwise,
+            # so large npm/docker/pip logs are never buffered; stderr is kept for errors
             result = subprocess.run(
                 command,
-                cwd=cwd or self.project_root,
+                cwd=os.fspath(cwd) if cwd else self._project_root_str,
                 check=check,
-                capture_output=True,
+                stdout=None if self.verbose else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True
             )
+            if cache_key is not None:
+                self._cmd_cache[cache_key] = result.returncode == 0
             return result.returncode == 0
         except subprocess.CalledProcessError as e:
             self.print_error(f"Command failed: {' '.join(command)}")
@@ -94,130 +158,252 @@ class SetupManager:
         except FileNotFoundError:
             self.print_error(f"Command not found: {command[0]}")
             return False
+    
+    async def run_command_async(self, command: List[str], cwd: Optional[Path] = None, check: bool = True,
+                                cache: bool = False) -> bool:
+        """Run a command without blocking the event loop and return success status (see run_command for cache)."""
+        cache_key = tuple(command) if cache else None
+        if cache_key in self._cmd_cache:
+            return self._cmd_cache[cache_key]
+        if self._job_slots is None:
+            self._job_slots = asyncio.Semaphore(self.jobs)
+        try:
+            async with self._job_slots:
+                proc = await asyncio.create_subprocess_exec(
+                    *command,
+                    cwd=os.fspath(cwd) if cwd else self._project_root_str,
+                    stdout=None if self.verbose else asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await proc.communicate()
+        except FileNotFoundError:
+            self.print_error(f"Command not found: {command[0]}")
+            return False
+        
+        if proc.returncode != 0 and check:
+            self.print_error(f"Command failed: {' '.join(command)}")
+            self.print_error(f"Error: {stderr.decode(errors='replace')}")
+        if cache_key is not None:
+            self._cmd_cache[cache_key] = proc.returncode == 0
+        return proc.returncode == 0
             
-    def check_prerequisites(self) -> bool:
+    async def check_prerequisites(self) -> bool:
         """Check if all required software is installed."""
         self.print_step("Checking prerequisites...")
         
-        required_tools = {
-            'python': ['python', '--version'],
-            'node': ['node', '--version'],
-            'npm': ['npm', '--version'],
-            'docker': ['docker', '--version'],
-            'git': ['git', '--version']
-        }
+        required_tools = ['python', 'node', 'npm', 'docker', 'git']
+        optional_tools = ['ollama']
         
-        missing_tools = []
+        # A previous successful check for the same PATH is reused for an hour
+        cache_file = self.cache_file
+        path_hash = hashlib.sha1(os.environ.get('PATH', '').encode()).hexdigest()
+        try:
+            cached = json.loads(cache_file.read_text()).get("prerequisites", {})
+        except (OSError, ValueError):
+            cached = {}
+        if cached.get("path_hash") == path_hash and time.time() - cached.get("checked_at", 0) < self.PREREQ_CACHE_TTL:
+            self.tools = {
+                name: ToolInfo(Path(info["path"]) if info["path"] else None, info["version"], info["ok"])
+                for name, info in cached.get("tools", {}).items()
+            }
+            self.print_success("All prerequisites are installed! (cached)")
+            return True
+        
+        # Probe all tools at once; later steps read self.tools instead of re-probing
+        all_tools = required_tools + optional_tools
+        self.tools = dict(zip(all_tools, await asyncio.gather(*(self._probe_tool(t) for t in all_tools))))
         
-        for tool, command in required_tools.items():
-            if not self.run_command(command, check=False):
-                missing_tools.append(tool)
+        missing_tools = [tool for tool in required_tools if not self.tools[tool].ok]
                 
         if missing_tools:
             self.print_error(f"Missing required tools: {', '.join(missing_tools)}")
             self.print_error("Please install the missing tools and run setup again.")
             return False
+        
+        # The cache only saves time on the next run, so failing to write it is not an error
+        try:
+            cache_file.write_text(json.dumps({
+                "prerequisites": {
+                    "path_hash": path_hash,
+                    "checked_at": time.time(),
+                    "tools": {
+                        name: {"path": str(info.path) if info.path else None, "version": info.version, "ok": info.ok}
+                        for name, info in self.tools.items()
+                    }
+                }
+            }))
+        except OSError as e:
+            if self.verbose:
+                self.print_warning(f"Could not write {cache_file.name}: {e}")
             
         self.print_success("All prerequisites are installed!")
         return True
+    
+    async def _probe_tool(self, name: str) -> ToolInfo:
+        """Resolve a tool on PATH; its version is only read in verbose mode."""
+        path = shutil.which(name)
+        if path is None:
+            return ToolInfo(path=None)
+        if not self.verbose:
+            return ToolInfo(path=Path(path), ok=True)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                path, '--version',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proc.communicate()
+        except OSError:
+            return ToolInfo(path=Path(path), ok=True)
+        version = stdout.decode(errors='replace').strip()
+        self.print_step(f"{name}: {version.splitlines()[0] if version else path}")
+        return ToolInfo(path=Path(path), version=version, ok=True)
         
     def setup_python_environment(self) -> bool:
         """Set up Python virtual environment and install dependencies."""
         self.print_step("Setting up Python environment...")
         
-        server_dir = self.project_root / "server"
-        venv_dir = server_dir / "venv"
+        venv_dir = self.venv_dir
         
-        # Create virtual environment
-        if not venv_dir.exists():
-            if not self.run_command([sys.executable, '-m', 'venv', str(venv_dir)]):
+        # One directory listing answers both "is there a venv" and "are there requirements"
+        try:
+            with os.scandir(self.server_dir) as entries:
+                children = {entry.name for entry in entries}
+        except FileNotFoundError:
+            children = set()
+        
+        # Create virtual environment in-process rather than forking `python -m venv`
+        if venv_dir.name not in children:
+            import venv
+            try:
+                venv.EnvBuilder(
+                    with_pip=True,
+                    symlinks=self.system != 'windows'
+                ).create(str(venv_dir))
+            except (OSError, subprocess.CalledProcessError) as e:
+                self.print_error(f"Failed to create virtual environment: {e}")
                 return False
-                
-        # Determine activation script
-        if self.system == 'windows':
-            activate_script = venv_dir / "Scripts" / "activate.bat"
-            pip_executable = venv_dir / "Scripts" / "pip.exe"
-        else:
-            activate_script = venv_dir / "bin" / "activate"
-            pip_executable = venv_dir / "bin" / "pip"
             
-        # Install requirements
-        requirements_file = server_dir / "requirements.txt"
-        if requirements_file.exists():
-            if not self.run_command([str(pip_executable), 'install', '-r', str(requirements_file)]):
-                return False
+        # Install requirements, skipping pip when this venv already has this exact file installed
+        requirements_file = self.server_dir / "requirements.txt"
+        if requirements_file.name in children:
+            req_hash = hashlib.sha256(requirements_file.read_bytes()).hexdigest()[:16]
+            installed_marker = venv_dir / f".installed-{req_hash}"
+            if installed_marker.exists():
+                self.print_success("Python requirements already installed")
+            else:
+                # pip is run through the venv interpreter, so only one process is launched
+                if not self.run_command([
+                    str(self.python_exe), '-m', 'pip', 'install',
+                    '--prefer-binary',
+                    '--cache-dir', str(self.project_root / '.pip-cache'),
+                    '--no-input',
+                    '--disable-pip-version-check',
+                    '-r', str(requirements_file)
+                ]):
+                    return False
+                installed_marker.touch()
                 
         self.print_success("Python environment set up successfully!")
         return True
         
-    def setup_node_environment(self) -> bool:
+    async def setup_node_environment(self) -> bool:
         """Set up Node.js environment for the VS Code extension."""
         self.print_step("Setting up Node.js environment...")
         
-        extension_dir = self.project_root / "extension"
+        extension_dir = self.extension_dir
         
         if not extension_dir.exists():
             self.print_warning("Extension directory not found, skipping Node.js setup")
             return True
+        
+        npm = self.tools.get('npm')
+        if npm is not None and not npm.ok:
+            self.print_warning("npm not found, skipping Node.js setup")
+            return True
             
         # Install npm dependencies
-        if not self.run_command(['npm', 'install'], cwd=extension_dir):
+        if not await self.run_command_async(['npm', 'install'], cwd=extension_dir):
             return False
             
         # Compile TypeScript
-        if not self.run_command(['npm', 'run', 'compile'], cwd=extension_dir):
+        if not await self.run_command_async(['npm', 'run', 'compile'], cwd=extension_dir):
             self.print_warning("TypeScript compilation failed, but continuing...")
             
         self.print_success("Node.js environment set up successfully!")
         return True
         
-    def setup_docker_services(self) -> bool:
+    async def setup_docker_services(self) -> bool:
         """Set up Docker services."""
         self.print_step("Setting up Docker services...")
         
+        docker = self.tools.get('docker')
+        if docker is not None and not docker.ok:
+            self.print_error("Docker is not installed. Please install Docker and try again.")
+            return False
+        
         # Check if Docker is running
-        if not self.run_command(['docker', 'info'], check=False):
+        if not await self.run_command_async(['docker', 'info', '--format', '{{.ServerVersion}}'], check=False, cache=True):
             self.print_error("Docker is not running. Please start Docker and try again.")
             return False
             
-        # Pull required Docker images
-        images = ['qdrant/qdrant:latest', 'redis:7-alpine']
-        
-        for image in images:
-            self.print_step(f"Pulling Docker image: {image}")
-            if not self.run_command(['docker', 'pull', image]):
+        required_images = ['qdrant/qdrant:latest', 'redis:7-alpine']
+        
+        # Skip images that are already present locally; inspect never touches the network
+        present = await asyncio.gather(*(
+            self.run_command_async(['docker', 'image', 'inspect', image], check=False)
+            for image in required_images
+        ))
+        images = []
+        for image, found in zip(required_images, present):
+            if found:
+                self.print_success(f"{image} already present")
+            else:
+                images.append(image)
+                self.print_step(f"Pulling Docker image: {image}")
+        
+        # Pull missing Docker images concurrently; they share no layers
+        results = await asyncio.gather(*(
+            self.run_command_async(['docker', 'pull', image]) for image in images
+        ))
+        for image, ok in zip(images, results):
+            if not ok:
                 self.print_warning(f"Failed to pull {image}, but continuing...")
                 
         self.print_success("Docker services set up successfully!")
         return True
         
-    def setup_ollama(self) -> bool:
+    async def setup_ollama(self) -> bool:
         """Set up Ollama and download required models."""
         self.print_step("Setting up Ollama...")
         
         # Check if Ollama is installed
-        if not self.run_command(['ollama', '--version'], check=False):
+        ollama = self.tools.get('ollama') or await self._probe_tool('ollama')
+        if not ollama.ok:
             self.print_warning("Ollama not found. Please install from https://ollama.ai")
             self.print_warning("After installation, run: ollama pull codellama:7b-code")
             return True
             
-        # Pull required models
+        # Pull required models concurrently
         models = ['codellama:7b-code', 'deepseek-coder:6.7b']
         
-        for model in models:
-            self.print_step(f"Pulling Ollama model: {model}")
-            if not self.run_command(['ollama', 'pull', model], check=False):
-                self.print_warning(f"Failed to pull {model}, you can install it later")
+        await asyncio.gather(*(self._pull_ollama_model(model) for model in models))
                 
         self.print_success("Ollama setup completed!")
         return True
+    
+    async def _pull_ollama_model(self, model: str):
+        """Pull a single Ollama model."""
+        self.print_step(f"Pulling Ollama model: {model}")
+        if not await self.run_command_async(['ollama', 'pull', model], check=False):
+            self.print_warning(f"Failed to pull {model}, you can install it later")
         
     def create_env_files(self) -> bool:
         """Create environment configuration files."""
         self.print_step("Creating environment files...")
         
         # Backend .env file
-        backend_env = self.project_root / "server" / ".env"
+        backend_env = self.env_file
         if not backend_env.exists():
             env_content = """# AI Coding Assistant Backend Configuration
 
@@ -251,11 +437,22 @@ MAX_CONCURRENT_REQUESTS=50
         self.print_success("Environment files created!")
         return True
         
+    def _write_json_if_changed(self, path: Path, obj: dict) -> bool:
+        """Write obj as JSON to path unless the file already holds identical content."""
+        new = json.dumps(obj, indent=2, sort_keys=True)
+        try:
+            if path.read_text() == new:
+                return False
+        except OSError:
+            pass
+        path.write_text(new)
+        return True
+        
     def create_vscode_settings(self) -> bool:
         """Create VS Code workspace settings."""
         self.print_step("Creating VS Code settings...")
         
-        vscode_dir = self.project_root / ".vscode"
+        vscode_dir = self.vscode_dir
         vscode_dir.mkdir(exist_ok=True)
         
         # Settings
@@ -278,7 +475,7 @@ MAX_CONCURRENT_REQUESTS=50
         }
         
         settings_file = vscode_dir / "settings.json"
-        settings_file.write_text(json.dumps(settings, indent=2))
+        self._write_json_if_changed(settings_file, settings)
         
         # Launch configuration
         launch_config = {
@@ -305,7 +502,7 @@ MAX_CONCURRENT_REQUESTS=50
         }
         
         launch_file = vscode_dir / "launch.json"
-        launch_file.write_text(json.dumps(launch_config, indent=2))
+        self._write_json_if_changed(launch_file, launch_config)
         
         self.print_success("VS Code settings created!")
         return True
@@ -343,24 +540,48 @@ MAX_CONCURRENT_REQUESTS=50
         """Run the complete setup process."""
         self.print_header("AI CODING ASSISTANT SETUP")
         
-        steps = [
+        pre_steps = [
             ("Checking prerequisites", self.check_prerequisites),
             ("Setting up Python environment", self.setup_python_environment),
+        ]
+        # Network-bound and independent of each other
+        parallel_steps = [
             ("Setting up Node.js environment", self.setup_node_environment),
             ("Setting up Docker services", self.setup_docker_services),
             ("Setting up Ollama", self.setup_ollama),
+        ]
+        post_steps = [
             ("Creating environment files", self.create_env_files),
             ("Creating VS Code settings", self.create_vscode_settings),
         ]
         
-        for step_name, step_func in steps:
-            try:
-                if not step_func():
-                    self.print_error(f"Failed: {step_name}")
-            except Exception as e:
-                self.print_error(f"Error in {step_name}: {str(e)}")
+        asyncio.run(self._run_async(pre_steps, parallel_steps, post_steps))
                 
         self.print_summary()
+    
+    async def _run_async(self, pre_steps, parallel_steps, post_steps):
+        """Run step groups in order, with the parallel group gathered on one event loop."""
+        for step_name, step_func in pre_steps:
+            await self._safe_run(step_name, step_func)
+        
+        await asyncio.gather(*(self._safe_run(step_name, step_func) for step_name, step_func in parallel_steps))
+        
+        for step_name, step_func in post_steps:
+            await self._safe_run(step_name, step_func)
+    
+    async def _safe_run(self, step_name: str, step_func) -> bool:
+        """Run a sync or async setup step, recording failures instead of raising."""
+        try:
+            result = step_func()
+            if asyncio.iscoroutine(result):
+                result = await result
+            if not result:
+                self.print_error(f"Failed: {step_name}")
+                return False
+            return True
+        except Exception as e:
+            self.print_error(f"Error in {step_name}: {str(e)}")
+            return False
 
     def interactive_api_key_setup(self):
         """Interactive setup for API keys."""
@@ -404,21 +625,19 @@ MAX_CONCURRENT_REQUESTS=50
             print(f"   Format: {provider_info['format']}")
 
             while True:
-                api_key = input(f"\n   Enter API key (or press Enter to skip): ").strip()
+                try:
+                    api_key = input(f"\n   Enter API key (or press Enter to skip): ").strip()
+                except EOFError:
+                    api_key = ""
 
                 if not api_key:
                     print(f"   {Colors.WARNING}Skipped {provider_info['name']}{Colors.ENDC}")
                     break
 
                 # Basic validation
-                if provider_id == "openai" and not api_key.startswith("sk-"):
-                    print(f"   {Colors.FAIL}Invalid format. OpenAI keys start with 'sk-'{Colors.ENDC}")
-                    continue
-                elif provider_id == "anthropic" and not api_key.startswith("sk-ant-"):
-                    print(f"   {Colors.FAIL}Invalid format. Anthropic keys start with 'sk-ant-'{Colors.ENDC}")
-                    continue
-                elif provider_id == "groq" and not api_key.startswith("gsk_"):
-                    print(f"   {Colors.FAIL}Invalid format. Groq keys start with 'gsk_'{Colors.ENDC}")
+                expected = self.API_KEY_PREFIXES.get(provider_id)
+                if expected and not api_key.startswith(expected):
+                    print(f"   {Colors.FAIL}Invalid format. {provider_info['name'].split(' (')[0]} keys start with '{expected}'{Colors.ENDC}")
                     continue
 
                 # Store the key
@@ -439,33 +658,41 @@ MAX_CONCURRENT_REQUESTS=50
 
     def update_env_file(self, updates: Dict[str, str]):
         """Update .env file with new values."""
-        env_file = self.project_root / "server" / ".env"
+        env_file = self.env_file
 
         # Read existing content
-        existing_content = ""
-        if env_file.exists():
-            with open(env_file, 'r') as f:
-                existing_content = f.read()
-
-        # Update or add new values
-        lines = existing_content.split('\n') if existing_content else []
-        updated_keys = set()
-
-        for i, line in enumerate(lines):
-            if '=' in line and not line.strip().startswith('#'):
-                key = line.split('=')[0].strip()
-                if key in updates:
-                    lines[i] = f"{key}={updates[key]}"
-                    updated_keys.add(key)
+        existing_content = env_file.read_text() if env_file.exists() else ""
+
+        # Update or add new values in a single pass
+        pending = dict(updates)
+        lines = []
+        for line in (existing_content.split('\n') if existing_content else []):
+            match = ENV_KEY_RE.match(line)
+            if match and match.group(1) in pending:
+                key = match.group(1)
+                line = f"{key}={pending.pop(key)}"
+            lines.append(line)
 
         # Add new keys that weren't found
-        for key, value in updates.items():
-            if key not in updated_keys:
-                lines.append(f"{key}={value}")
-
-        # Write back to file
-        with open(env_file, 'w') as f:
-            f.write('\n'.join(lines))
+        lines.extend(f"{key}={value}" for key, value in pending.items())
+
+        # Write back to file only if something changed
+        new_content = '\n'.join(lines)
+        if new_content != existing_content:
+            # Write to a sibling temp file and swap it in so an interrupted write can't truncate .env
+            # Created owner-only so API keys are never exposed through the umask's default mode
+            tmp_file = env_file.with_name(env_file.name + ".tmp")
+            tmp_file.unlink(missing_ok=True)  # leftover from a killed run
+            fd = os.open(tmp_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(new_content)
+                if env_file.exists():
+                    shutil.copymode(env_file, tmp_file)
+                os.replace(tmp_file, env_file)
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
 
 def main():
     """Main entry point with enhanced argument parsing."""
@@ -485,6 +712,7 @@ Examples:
   python setup.py --skip-ollama      # Skip Ollama installation
   python setup.py --skip-models      # Skip model downloads
   python setup.py --quick            # Quick setup (minimal components)
+  python setup.py --jobs 1           # Run downloads one at a time (slow links)
         """
     )
 
@@ -531,6 +759,13 @@ Examples:
         help="Interactive API key configuration"
     )
 
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=min(4, os.cpu_count() or 2),
+        help="Maximum number of downloads/installs to run at once (default: %(default)s)"
+    )
+
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -547,10 +782,11 @@ Examples:
 {Colors.OKCYAN}Dual-Mode AI Processing: Local Privacy + Cloud Performance{Colors.ENDC}
 
 Setup Mode: {Colors.OKGREEN}{args.mode.upper()}{Colors.ENDC}
+Parallel Jobs: {Colors.OKGREEN}{args.jobs}{Colors.ENDC}
 """)
 
     # Create setup manager with configuration
-    setup = SetupManager(setup_mode=args.mode)
+    setup = SetupManager(setup_mode=args.mode, jobs=args.jobs)
 
     # Apply command line options
     if args.skip_ollama or args.mode == "online":
@@ -5,10 +5,17 @@ Tests all components and dependencies to ensure proper installation.
 """
 
 import os
+import platform
+import shutil
+import signal
 import sys
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import List, Union
 
 class Colors:
     OKGREEN = '\033[92m'
@@ -17,6 +24,16 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+    @classmethod
+    def disable(cls):
+        """Turn all codes into empty strings."""
+        for name in ('OKGREEN', 'WARNING', 'FAIL', 'ENDC', 'BOLD'):
+            setattr(cls, name, '')
+
+# Plain output when redirected to a file/CI log or when NO_COLOR is set
+if not sys.stdout.isatty() or os.environ.get('NO_COLOR') is not None:
+    Colors.disable()
+
 def print_test(name: str):
     print(f"🧪 Testing {name}...")
 
@@ -29,12 +46,35 @@ def print_error(text: str):
 def print_warning(text: str):
     print(f"{Colors.WARNING}⚠️ {text}{Colors.ENDC}")
 
-def run_command(command: str, timeout: int = 30) -> tuple[bool, str]:
+# Per-category probe timeouts in seconds, so one hung probe can't stall the run for long
+TIMEOUTS = {
+    "version": 10,   # `tool --version`; npm and Windows cold starts can take several seconds
+    "list": 10,      # `docker ps`, `ollama list`
+    "service": 10,   # waiting for a service to come up
+    "import": 120,   # really importing heavy packages (REFLYX_TEST_DEEP=1)
+    "default": 15,
+}
+
+def resolve_command(command: Union[str, List[str]]) -> tuple[Union[str, List[str]], bool]:
+    """Return the command to launch and whether it needs a shell.
+
+    Argument lists run without an intermediate shell; the executable is resolved with
+    shutil.which so that Windows .cmd shims such as npm are still found.
+    """
+    if isinstance(command, str):
+        return command, True
+    executable = shutil.which(command[0])
+    if executable:
+        command = [executable, *command[1:]]
+    return command, False
+
+def run_command(command: Union[str, List[str]], timeout: int = TIMEOUTS["default"]) -> tuple[bool, str]:
     """Run a command and return success status and output."""
     try:
+        command, shell = resolve_command(command)
         result = subprocess.run(
             command,
-            shell=True,
+            shell=shell,
             capture_output=True,
             text=True,
             timeout=timeout
@@ -45,31 +85,129 @@ def run_command(command: str, timeout: int = 30) -> tuple[bool, str]:
     except Exception as e:
         return False, str(e)
 
+def run_command_streaming(command: Union[str, List[str]], needle: str, timeout: int = TIMEOUTS["default"]) -> tuple[bool, str]:
+    """Run a command, stopping as soon as a line containing needle (case-insensitive) appears.
+
+    Returns success and the output read so far; without a match, success is the exit status.
+    """
+    try:
+        command, shell = resolve_command(command)
+        process = subprocess.Popen(
+            command,
+            shell=shell,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            # Own process group, so stopping the shell also stops the command it launched
+            start_new_session=os.name != 'nt'
+        )
+    except Exception as e:
+        return False, str(e)
+    
+    def stop():
+        if os.name == 'nt':
+            process.kill()
+        else:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+    
+    timed_out = threading.Event()
+    timer = threading.Timer(timeout, lambda: (timed_out.set(), stop()))
+    timer.start()
+    needle = needle.lower()
+    lines = []
+    try:
+        for line in process.stdout:
+            lines.append(line)
+            if needle in line.lower():
+                stop()
+                process.wait()
+                return True, "".join(lines)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+    
+    if timed_out.is_set():
+        return False, "Command timed out"
+    return returncode == 0, "".join(lines)
+
+def find_ollama() -> str:
+    """Resolve the Ollama executable once: PATH first, then the default Windows install."""
+    found = shutil.which("ollama")
+    if found:
+        return found
+    default = os.path.expanduser(r"~\AppData\Local\Programs\Ollama\ollama.exe")
+    if os.name == 'nt' and os.path.exists(default):
+        return default
+    return "ollama"
+
+OLLAMA_EXE = find_ollama()
+
+# Independent version/status probes: (name, command, timeout, needle). Probes with a
+# needle stream their output and stop at the first line that contains it.
+PROBES = [
+    ("node", ["node", "--version"], TIMEOUTS["version"], None),
+    ("npm", ["npm", "--version"], TIMEOUTS["version"], None),
+    ("docker", ["docker", "--version"], TIMEOUTS["version"], None),
+    ("docker_ps", ["docker", "ps"], TIMEOUTS["list"], "CONTAINER ID"),
+    ("ollama", [OLLAMA_EXE, "--version"], TIMEOUTS["version"], None),
+    ("ollama_list", [OLLAMA_EXE, "list"], TIMEOUTS["list"], "codellama"),
+]
+
+probe_results: dict[str, tuple[bool, str]] = {}
+
+def run_probes():
+    """Run all probes concurrently; they are subprocess waits, so threads overlap them."""
+    with ThreadPoolExecutor(max_workers=len(PROBES)) as executor:
+        futures = {
+            name: executor.submit(*_probe_call(command, timeout, needle))
+            for name, command, timeout, needle in PROBES
+        }
+        for name, future in futures.items():
+            probe_results[name] = future.result()
+
+def probe(name: str) -> tuple[bool, str]:
+    """Return a probe result, running it now if run_probes() hasn't already."""
+    if name not in probe_results:
+        _, command, timeout, needle = next(p for p in PROBES if p[0] == name)
+        func, *args = _probe_call(command, timeout, needle)
+        probe_results[name] = func(*args)
+    return probe_results[name]
+
+def _probe_call(command: List[str], timeout: int, needle) -> tuple:
+    """The function and arguments that run one probe."""
+    if needle:
+        return run_command_streaming, command, needle, timeout
+    return run_command, command, timeout
+
+PROJECT_ROOT = Path(__file__).parent
+
+@lru_cache(maxsize=None)
+def dir_entries(path: Path) -> frozenset[str]:
+    """Names in a directory, listed once per run; empty if it doesn't exist."""
+    try:
+        with os.scandir(path) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
 def test_python():
     """Test Python installation."""
     print_test("Python")
     
-    # Check Python version
-    success, output = run_command("python --version")
-    if success:
-        version = output.strip()
-        print_success(f"Python installed: {version}")
-        
-        # Check if version is 3.8+
-        try:
-            version_parts = version.split()[1].split('.')
-            major, minor = int(version_parts[0]), int(version_parts[1])
-            if major >= 3 and minor >= 8:
-                print_success("Python version is compatible (3.8+)")
-                return True
-            else:
-                print_error(f"Python version {major}.{minor} is too old (need 3.8+)")
-                return False
-        except:
-            print_warning("Could not parse Python version")
-            return True
+    # This script is itself running under Python, so read the version in-process
+    major, minor = sys.version_info[:2]
+    print_success(f"Python installed: Python {platform.python_version()}")
+    
+    # Check if version is 3.8+
+    if (major, minor) >= (3, 8):
+        print_success("Python version is compatible (3.8+)")
+        return True
     else:
-        print_error("Python not found")
+        print_error(f"Python version {major}.{minor} is too old (need 3.8+)")
         return False
 
 def test_nodejs():
@@ -77,7 +215,7 @@ def test_nodejs():
     print_test("Node.js and npm")
     
     # Test Node.js
-    success, output = run_command("node --version")
+    success, output = probe("node")
     if not success:
         print_error("Node.js not found")
         return False
@@ -86,7 +224,7 @@ def test_nodejs():
     print_success(f"Node.js installed: {node_version}")
     
     # Test npm
-    success, output = run_command("npm --version")
+    success, output = probe("npm")
     if not success:
         print_error("npm not found")
         return False
@@ -100,7 +238,7 @@ def test_docker():
     print_test("Docker")
     
     # Check Docker version
-    success, output = run_command("docker --version")
+    success, output = probe("docker")
     if not success:
         print_error("Docker not found")
         return False
@@ -109,7 +247,7 @@ def test_docker():
     print_success(f"Docker installed: {docker_version}")
     
     # Check if Docker is running
-    success, output = run_command("docker ps", timeout=10)
+    success, output = probe("docker_ps")
     if success:
         print_success("Docker is running")
         return True
@@ -122,15 +260,8 @@ def test_ollama():
     """Test Ollama installation and status."""
     print_test("Ollama")
     
-    # Add Ollama to PATH for this session
-    ollama_path = os.path.expanduser(r"~\AppData\Local\Programs\Ollama")
-    if os.path.exists(ollama_path):
-        current_path = os.environ.get("PATH", "")
-        if ollama_path not in current_path:
-            os.environ["PATH"] = f"{ollama_path};{current_path}"
-    
     # Check Ollama version
-    success, output = run_command("ollama --version")
+    success, output = probe("ollama")
     if not success:
         print_error("Ollama not found")
         print_warning("Install Ollama from https://ollama.ai")
@@ -140,7 +271,7 @@ def test_ollama():
     print_success(f"Ollama installed: {ollama_version}")
     
     # Check if Ollama service is running
-    success, output = run_command("ollama list", timeout=10)
+    success, output = probe("ollama_list")
     if success:
         print_success("Ollama service is running")
         if "codellama" in output.lower():
@@ -153,13 +284,20 @@ def test_ollama():
         print_warning("Starting Ollama service...")
         
         # Try to start Ollama service
-        subprocess.Popen(["ollama", "serve"], 
+        subprocess.Popen([OLLAMA_EXE, "serve"], 
                         stdout=subprocess.DEVNULL, 
                         stderr=subprocess.DEVNULL)
         
-        # Wait a moment and test again
-        time.sleep(3)
-        success, output = run_command("ollama list", timeout=10)
+        # Poll with exponential backoff until the service answers or the budget runs out
+        deadline = time.monotonic() + TIMEOUTS["service"]
+        delay = 0.05
+        success = False
+        while time.monotonic() < deadline:
+            success, output = run_command([OLLAMA_EXE, "list"], timeout=TIMEOUTS["list"])
+            if success:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
         if success:
             print_success("Ollama service started successfully")
             return True
@@ -171,23 +309,21 @@ def test_project_structure():
     """Test project structure and files."""
     print_test("Project Structure")
     
-    project_root = Path(__file__).parent
     required_dirs = ["server", "extension", "docs"]
     required_files = ["setup.py", "docker-compose.yml", "README.md"]
+    root_entries = dir_entries(PROJECT_ROOT)
     
     all_good = True
     
     for dir_name in required_dirs:
-        dir_path = project_root / dir_name
-        if dir_path.exists():
+        if dir_name in root_entries:
             print_success(f"Directory exists: {dir_name}")
         else:
             print_error(f"Missing directory: {dir_name}")
             all_good = False
     
     for file_name in required_files:
-        file_path = project_root / file_name
-        if file_path.exists():
+        if file_name in root_entries:
             print_success(f"File exists: {file_name}")
         else:
             print_error(f"Missing file: {file_name}")
@@ -195,14 +331,16 @@ def test_project_structure():
     
     return all_good
 
+# Packages whose import initialises native backends and takes seconds
+HEAVY_PACKAGES = ["sentence_transformers", "torch"]
+
 def test_python_dependencies():
     """Test Python dependencies installation."""
     print_test("Python Dependencies")
     
-    project_root = Path(__file__).parent
-    venv_path = project_root / "server" / "venv"
+    venv_path = PROJECT_ROOT / "server" / "venv"
     
-    if not venv_path.exists():
+    if "venv" not in dir_entries(venv_path.parent):
         print_warning("Python virtual environment not found")
         return False
     
@@ -212,7 +350,7 @@ def test_python_dependencies():
     else:
         python_exe = venv_path / "bin" / "python"
     
-    if not python_exe.exists():
+    if python_exe.name not in dir_entries(python_exe.parent):
         print_error("Python executable not found in virtual environment")
         return False
     
@@ -227,10 +365,29 @@ def test_python_dependencies():
         "torch"
     ]
     
+    # One venv interpreter checks every package with find_spec, which locates the
+    # package without executing it (importing torch alone can take seconds)
+    probe_code = (
+        "import importlib.util; "
+        f"[print(m + ':' + ('OK' if importlib.util.find_spec(m) else 'MISS')) for m in {test_imports!r}]"
+    )
+    success, output = run_command([str(python_exe), "-c", probe_code], timeout=TIMEOUTS["default"])
+    found = {}
+    if success:
+        for line in output.splitlines():
+            name, sep, status = line.strip().partition(':')
+            if sep:
+                found[name] = status == 'OK'
+    
+    # Locating a package doesn't prove it loads; REFLYX_TEST_DEEP=1 also imports the heavy ones
+    if os.environ.get("REFLYX_TEST_DEEP") == "1":
+        for package in HEAVY_PACKAGES:
+            if found.get(package):
+                found[package], _ = run_command([str(python_exe), "-c", f"import {package}"], timeout=TIMEOUTS["import"])
+    
     all_good = True
     for package in test_imports:
-        success, output = run_command(f'"{python_exe}" -c "import {package}; print(f\'{package} OK\')"')
-        if success:
+        if found.get(package):
             print_success(f"Package available: {package}")
         else:
             print_error(f"Package missing or broken: {package}")
@@ -242,32 +399,31 @@ def test_extension_build():
     """Test VS Code extension build."""
     print_test("VS Code Extension")
     
-    project_root = Path(__file__).parent
-    extension_dir = project_root / "extension"
+    extension_dir = PROJECT_ROOT / "extension"
     
-    if not extension_dir.exists():
+    if "extension" not in dir_entries(PROJECT_ROOT):
         print_error("Extension directory not found")
         return False
     
+    # One listing answers the package.json, node_modules and out checks
+    extension_entries = dir_entries(extension_dir)
+    
     # Check if package.json exists
-    package_json = extension_dir / "package.json"
-    if not package_json.exists():
+    if "package.json" not in extension_entries:
         print_error("package.json not found in extension directory")
         return False
     
     print_success("Extension directory structure OK")
     
     # Check if node_modules exists
-    node_modules = extension_dir / "node_modules"
-    if node_modules.exists():
+    if "node_modules" in extension_entries:
         print_success("Node modules installed")
     else:
         print_warning("Node modules not installed")
         return False
     
     # Check if compiled output exists
-    out_dir = extension_dir / "out"
-    if out_dir.exists():
+    if "out" in extension_entries:
         print_success("Extension compiled successfully")
     else:
         print_warning("Extension not compiled yet")
@@ -290,6 +446,9 @@ def main():
         ("VS Code Extension", test_extension_build),
     ]
     
+    # Fire all tool probes up front so their waits overlap; tests print in order afterwards
+    run_probes()
+    
     results = {}
     
     for test_name, test_func in tests:
@@ -300,35 +459,37 @@ def main():
             print_error(f"Test failed with exception: {e}")
             results[test_name] = False
     
-    # Summary
-    print(f"\n{Colors.BOLD}📊 Test Summary{Colors.ENDC}")
-    print("=" * 50)
-    
+    # Summary, collected and written in one go
     passed = sum(results.values())
     total = len(results)
     
+    lines = [f"\n{Colors.BOLD}📊 Test Summary{Colors.ENDC}", "=" * 50]
     for test_name, result in results.items():
         status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{test_name:<20} {status}")
+        lines.append(f"{test_name:<20} {status}")
     
-    print(f"\nOverall: {passed}/{total} tests passed")
+    lines.append(f"\nOverall: {passed}/{total} tests passed")
     
     if passed == total:
-        print_success("🎉 All tests passed! Installation is ready.")
-        print("\nNext steps:")
-        print("1. Run: python setup.py --mode local")
-        print("2. Start services: docker-compose up -d")
-        print("3. Install VS Code extension")
-        print("4. Start coding with AI assistance!")
-        return True
+        lines += [
+            f"{Colors.OKGREEN}✅ 🎉 All tests passed! Installation is ready.{Colors.ENDC}",
+            "\nNext steps:",
+            "1. Run: python setup.py --mode local",
+            "2. Start services: docker-compose up -d",
+            "3. Install VS Code extension",
+            "4. Start coding with AI assistance!",
+        ]
     else:
-        print_error("❌ Some tests failed. Please fix the issues above.")
-        print("\nCommon fixes:")
-        print("• Start Docker Desktop")
-        print("• Run: ollama serve (in background)")
-        print("• Run: python setup.py --mode local")
-        print("• Check installation guides in docs/")
-        return False
+        lines += [
+            f"{Colors.FAIL}❌ ❌ Some tests failed. Please fix the issues above.{Colors.ENDC}",
+            "\nCommon fixes:",
+            "• Start Docker Desktop",
+            "• Run: ollama serve (in background)",
+            "• Run: python setup.py --mode local",
+            "• Check installation guides in docs/",
+        ]
+    sys.stdout.write("\n".join(lines) + "\n")
+    return passed == total
 
 if __name__ == "__main__":
     success = main()
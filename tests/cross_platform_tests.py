@@ -9,36 +9,129 @@ import sys
 import platform
 import subprocess
 import json
-import tempfile
-import shutil
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Fixed for the life of the process
+_HERE = Path(__file__).resolve().parent
+_PROJECT_ROOT = _HERE.parent
+_SYSTEM_LOWER = platform.system().lower()
+
+def _processor_name() -> str:
+    """CPU model from /proc/cpuinfo where available; platform.processor() can fork on Linux."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+@lru_cache(maxsize=1)
+def _system_info() -> Dict[str, str]:
+    """Collect platform details once; platform.processor() and friends can shell out."""
+    if os.name == 'posix':
+        # One uname() call answers system, release, version and machine
+        uname = os.uname()
+        system, release, version, machine = uname.sysname, uname.release, uname.version, uname.machine
+    else:
+        system, release, version, machine = (
+            platform.system(), platform.release(), platform.version(), platform.machine()
+        )
+    return {
+        "system": system,
+        "release": release,
+        "version": version,
+        "machine": machine,
+        "processor": _processor_name(),
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        # Pointer width, without platform.architecture() running `file` on the interpreter
+        "architecture": f"{struct.calcsize('P') * 8}bit"
+    }
+
+@lru_cache(maxsize=32)
+def _resolve(host: str) -> str:
+    """Resolve a hostname to an IPv4 address, once per process."""
+    import socket
+    
+    return socket.gethostbyname(host)
+
+class TestResult:
+    """Outcome of one cross-platform check; slotted since suites create many of them."""
+    
+    __slots__ = ("name", "passed", "message", "details", "error")
+    
+    def __init__(self, name: str, passed: bool, message: str = "",
+                 details: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        self.name = name
+        self.passed = passed
+        self.message = message
+        self.details = details
+        self.error = error
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Record as written to the results JSON, one key per field in declaration order."""
+        return {
+            "name": self.name,
+            "passed": self.passed,
+            "message": self.message,
+            "details": self.details,
+            "error": self.error
+        }
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    """Write a small payload with raw os calls, skipping the text I/O and codec layers."""
+    flags = os.O_CREAT | os.O_WRONLY | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
 class CrossPlatformTester:
     """Tests cross-platform compatibility and functionality."""
     
+    # Platform-specific commands: (command, description). An argv tuple runs without a
+    # shell, a tuple of argv tuples is a pipeline, and a string needs the shell (cmd.exe
+    # builtins such as dir and echo have no executable of their own).
+    _WIN_COMMANDS = (
+        ("dir", "List directory contents"),
+        ("echo Hello", "Echo command"),
+        (("where", "python"), "Find Python executable"),
+        (("powershell", "-Command", "Get-Process"), "PowerShell command"),
+    )
+    _UNIX_COMMANDS = (
+        (("ls",), "List directory contents"),
+        (("echo", "Hello"), "Echo command"),
+        (("which", "python3"), "Find Python executable"),
+        ((("ps", "aux"), ("head", "-5")), "Process list"),
+    )
+    
     def __init__(self):
-        self.system = platform.system().lower()
-        self.project_root = Path(__file__).parent.parent
+        self.system = _SYSTEM_LOWER
+        self._is_windows = self.system == "windows"
+        self._commands = self._WIN_COMMANDS if self._is_windows else self._UNIX_COMMANDS
+        self.project_root = _PROJECT_ROOT
         self.test_results = []
         
     def get_system_info(self) -> Dict[str, str]:
         """Get detailed system information."""
-        return {
-            "system": platform.system(),
-            "release": platform.release(),
-            "version": platform.version(),
-            "machine": platform.machine(),
-            "processor": platform.processor(),
-            "python_version": platform.python_version(),
-            "python_implementation": platform.python_implementation(),
-            "architecture": platform.architecture()[0]
-        }
+        return dict(_system_info())
     
-    def test_path_handling(self) -> List[Dict[str, Any]]:
+    def test_path_handling(self) -> List[TestResult]:
         """Test path handling across platforms."""
         results = []
         
@@ -55,84 +148,127 @@ class CrossPlatformTester:
                 # Test Path object creation
                 path_obj = Path(path_str)
                 
-                # Test path resolution
-                resolved = path_obj.resolve()
+                # Test path resolution against the project root; abspath is pure string
+                # manipulation, unlike resolve() which lstat()s every component
+                resolved = Path(os.path.abspath(self.project_root / path_obj))
                 
                 # Test path operations
                 parent = path_obj.parent
                 name = path_obj.name
                 suffix = path_obj.suffix
                 
-                results.append({
-                    "test": f"Path handling: {path_str}",
-                    "passed": True,
-                    "details": {
+                results.append(TestResult(
+                    f"Path handling: {path_str}",
+                    True,
+                    details={
                         "resolved": str(resolved),
                         "parent": str(parent),
                         "name": name,
                         "suffix": suffix
                     }
-                })
+                ))
                 
             except Exception as e:
-                results.append({
-                    "test": f"Path handling: {path_str}",
-                    "passed": False,
-                    "error": str(e)
-                })
+                results.append(TestResult(
+                    f"Path handling: {path_str}",
+                    False,
+                    error=str(e)
+                ))
         
         return results
     
-    def test_command_execution(self) -> List[Dict[str, Any]]:
+    def test_command_execution(self) -> List[TestResult]:
         """Test command execution across platforms."""
         results = []
         
-        # Platform-specific commands
-        if self.system == "windows":
-            test_commands = [
-                ("dir", "List directory contents"),
-                ("echo Hello", "Echo command"),
-                ("where python", "Find Python executable"),
-                ("powershell -Command Get-Process", "PowerShell command")
-            ]
-        else:  # Unix-like (macOS, Linux)
-            test_commands = [
-                ("ls", "List directory contents"),
-                ("echo Hello", "Echo command"),
-                ("which python3", "Find Python executable"),
-                ("ps aux | head -5", "Process list")
-            ]
+        # Start every command first so their process start-up and run time overlap
+        launched = []
+        for command, description in self._commands:
+            try:
+                launched.append((command, description, self._launch(command), None))
+            except Exception as e:
+                launched.append((command, description, [], e))
         
-        for command, description in test_commands:
+        for command, description, processes, error in launched:
+            display = self._display_command(command)
             try:
-                result = subprocess.run(
-                    command,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                if error is not None:
+                    raise error
+                # The last process of a pipeline carries its output and exit status
+                process = processes[-1]
+                try:
+                    stdout, _ = process.communicate(timeout=10)
+                except subprocess.TimeoutExpired:
+                    for p in processes:
+                        p.kill()
+                    process.communicate()
+                    raise
+                finally:
+                    for p in processes[:-1]:
+                        p.wait()
                 
-                results.append({
-                    "test": f"Command execution: {description}",
-                    "passed": result.returncode == 0,
-                    "command": command,
-                    "return_code": result.returncode,
-                    "output_length": len(result.stdout)
-                })
+                results.append(TestResult(
+                    f"Command execution: {description}",
+                    process.returncode == 0,
+                    details={
+                        "command": display,
+                        "return_code": process.returncode,
+                        "output_length": len(stdout)
+                    }
+                ))
                 
             except Exception as e:
-                results.append({
-                    "test": f"Command execution: {description}",
-                    "passed": False,
-                    "command": command,
-                    "error": str(e)
-                })
+                results.append(TestResult(
+                    f"Command execution: {description}",
+                    False,
+                    error=str(e),
+                    details={
+                        "command": display
+                    }
+                ))
         
         return results
     
-    def test_file_operations(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _launch(command) -> List[subprocess.Popen]:
+        """Start a command (see _UNIX_COMMANDS) and return its processes in pipeline order.
+
+        Only the byte length of the final stdout is recorded, so it is read undecoded and
+        stderr is discarded.
+        """
+        if isinstance(command, str):
+            return [subprocess.Popen(command, shell=True, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL)]
+        stages = command if isinstance(command[0], tuple) else (command,)
+        processes = []
+        stdin = None
+        for i, argv in enumerate(stages):
+            process = subprocess.Popen(
+                argv,
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            if stdin is not None:
+                # Only the next stage should hold the read end, so SIGPIPE reaches the writer
+                stdin.close()
+            stdin = process.stdout
+            processes.append(process)
+        return processes
+    
+    @staticmethod
+    def _display_command(command) -> str:
+        """Render a command the way it would be typed in a shell."""
+        if isinstance(command, str):
+            return command
+        if isinstance(command[0], tuple):
+            return " | ".join(" ".join(argv) for argv in command)
+        return " ".join(command)
+    
+    def test_file_operations(self) -> List[TestResult]:
         """Test file operations across platforms."""
+        import tempfile
+        
         results = []
         
         # Create temporary directory for testing
@@ -142,44 +278,49 @@ class CrossPlatformTester:
             # Test file creation
             try:
                 test_file = temp_path / "test_file.txt"
-                test_file.write_text("Hello, World!", encoding='utf-8')
+                _write_bytes(test_file, b"Hello, World!")
                 
-                results.append({
-                    "test": "File creation",
-                    "passed": test_file.exists(),
-                    "path": str(test_file)
-                })
+                # The write raising nothing is the success signal; no follow-up stat needed
+                results.append(TestResult(
+                    "File creation",
+                    True,
+                    details={
+                        "path": str(test_file)
+                    }
+                ))
                 
             except Exception as e:
-                results.append({
-                    "test": "File creation",
-                    "passed": False,
-                    "error": str(e)
-                })
+                results.append(TestResult(
+                    "File creation",
+                    False,
+                    error=str(e)
+                ))
             
             # Test directory creation
             try:
                 test_dir = temp_path / "test_directory"
                 test_dir.mkdir()
                 
-                results.append({
-                    "test": "Directory creation",
-                    "passed": test_dir.exists() and test_dir.is_dir(),
-                    "path": str(test_dir)
-                })
+                results.append(TestResult(
+                    "Directory creation",
+                    True,
+                    details={
+                        "path": str(test_dir)
+                    }
+                ))
                 
             except Exception as e:
-                results.append({
-                    "test": "Directory creation",
-                    "passed": False,
-                    "error": str(e)
-                })
+                results.append(TestResult(
+                    "Directory creation",
+                    False,
+                    error=str(e)
+                ))
             
             # Test file permissions (Unix-like systems)
-            if self.system != "windows":
+            if not self._is_windows:
                 try:
                     test_file = temp_path / "permission_test.txt"
-                    test_file.write_text("test")
+                    _write_bytes(test_file, b"test")
                     
                     # Make file executable
                     test_file.chmod(0o755)
@@ -187,48 +328,57 @@ class CrossPlatformTester:
                     # Check if file is executable
                     is_executable = os.access(test_file, os.X_OK)
                     
-                    results.append({
-                        "test": "File permissions",
-                        "passed": is_executable,
-                        "path": str(test_file)
-                    })
+                    results.append(TestResult(
+                        "File permissions",
+                        is_executable,
+                        details={
+                            "path": str(test_file)
+                        }
+                    ))
                     
                 except Exception as e:
-                    results.append({
-                        "test": "File permissions",
-                        "passed": False,
-                        "error": str(e)
-                    })
+                    results.append(TestResult(
+                        "File permissions",
+                        False,
+                        error=str(e)
+                    ))
         
         return results
     
-    def test_environment_variables(self) -> List[Dict[str, Any]]:
+    def test_environment_variables(self) -> List[TestResult]:
         """Test environment variable handling."""
         results = []
         
+        # Snapshot the environment once; each os.environ lookup goes through its mapping proxy
+        env = os.environ.copy()
+        
         # Test reading common environment variables
         common_vars = ["PATH", "HOME", "USER"]
-        if self.system == "windows":
+        if self._is_windows:
             common_vars.extend(["USERPROFILE", "APPDATA", "LOCALAPPDATA"])
         
         for var in common_vars:
             try:
-                value = os.environ.get(var)
-                results.append({
-                    "test": f"Environment variable: {var}",
-                    "passed": value is not None,
-                    "variable": var,
-                    "has_value": value is not None,
-                    "value_length": len(value) if value else 0
-                })
+                value = env.get(var)
+                results.append(TestResult(
+                    f"Environment variable: {var}",
+                    value is not None,
+                    details={
+                        "variable": var,
+                        "has_value": value is not None,
+                        "value_length": len(value) if value else 0
+                    }
+                ))
                 
             except Exception as e:
-                results.append({
-                    "test": f"Environment variable: {var}",
-                    "passed": False,
-                    "variable": var,
-                    "error": str(e)
-                })
+                results.append(TestResult(
+                    f"Environment variable: {var}",
+                    False,
+                    error=str(e),
+                    details={
+                        "variable": var
+                    }
+                ))
         
         # Test setting and reading custom environment variable
         try:
@@ -238,33 +388,30 @@ class CrossPlatformTester:
             os.environ[test_var] = test_value
             retrieved_value = os.environ.get(test_var)
             
-            results.append({
-                "test": "Custom environment variable",
-                "passed": retrieved_value == test_value,
-                "variable": test_var,
-                "expected": test_value,
-                "actual": retrieved_value
-            })
+            results.append(TestResult(
+                "Custom environment variable",
+                retrieved_value == test_value,
+                details={
+                    "variable": test_var,
+                    "expected": test_value,
+                    "actual": retrieved_value
+                }
+            ))
             
             # Clean up
             del os.environ[test_var]
             
         except Exception as e:
-            results.append({
-                "test": "Custom environment variable",
-                "passed": False,
-                "error": str(e)
-            })
+            results.append(TestResult(
+                "Custom environment variable",
+                False,
+                error=str(e)
+            ))
         
         return results
     
-    def test_network_connectivity(self) -> List[Dict[str, Any]]:
+    def test_network_connectivity(self) -> List[TestResult]:
         """Test network connectivity and DNS resolution."""
-        results = []
-        
-        # Test DNS resolution
-        import socket
-        
         test_hosts = [
             ("google.com", 80),
             ("github.com", 443),
@@ -272,40 +419,50 @@ class CrossPlatformTester:
             ("localhost", 8000)
         ]
         
-        for host, port in test_hosts:
+        # Each probe mostly waits on DNS or a connect timeout, so run them side by side
+        with ThreadPoolExecutor(max_workers=len(test_hosts)) as executor:
+            return list(executor.map(lambda host_port: self._probe_host(*host_port), test_hosts))
+    
+    def _probe_host(self, host: str, port: int) -> TestResult:
+        """Resolve a host and try a TCP connection to it."""
+        import socket
+        
+        try:
+            # Test DNS resolution (memoized, so repeat runs skip the resolver)
+            ip = _resolve(host)
+            
+            # Test connection (with timeout) to the resolved address
             try:
-                # Test DNS resolution
-                ip = socket.gethostbyname(host)
-                
-                # Test connection (with timeout)
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
-                result = sock.connect_ex((host, port))
-                sock.close()
-                
-                results.append({
-                    "test": f"Network connectivity: {host}:{port}",
-                    "passed": result == 0,
+                with socket.create_connection((ip, port), timeout=5):
+                    result = 0
+            except OSError as e:
+                result = e.errno if e.errno is not None else -1
+            
+            return TestResult(
+                f"Network connectivity: {host}:{port}",
+                result == 0,
+                details={
                     "host": host,
                     "port": port,
                     "ip": ip,
                     "connection_result": result
-                })
-                
-            except Exception as e:
-                results.append({
-                    "test": f"Network connectivity: {host}:{port}",
-                    "passed": False,
+                }
+            )
+            
+        except Exception as e:
+            return TestResult(
+                f"Network connectivity: {host}:{port}",
+                False,
+                error=str(e),
+                details={
                     "host": host,
-                    "port": port,
-                    "error": str(e)
-                })
-        
-        return results
+                    "port": port
+                }
+            )
     
-    def test_unicode_handling(self) -> List[Dict[str, Any]]:
+    def test_unicode_handling(self) -> List[TestResult]:
         """Test Unicode and encoding handling."""
-        results = []
+        import tempfile
         
         # Test Unicode strings
         test_strings = [
@@ -317,50 +474,61 @@ class CrossPlatformTester:
             "العربية"
         ]
         
-        for test_string in test_strings:
-            try:
-                # Test encoding/decoding
-                encoded = test_string.encode('utf-8')
-                decoded = encoded.decode('utf-8')
-                
-                # Test file I/O with Unicode
-                with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False) as f:
-                    f.write(test_string)
-                    temp_file = f.name
-                
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    read_string = f.read()
-                
-                os.unlink(temp_file)
-                
-                results.append({
-                    "test": f"Unicode handling: {test_string[:20]}...",
-                    "passed": decoded == test_string and read_string == test_string,
+        # One temporary directory for every round-trip, with the strings checked in parallel
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(
+                    lambda item: self._unicode_roundtrip(temp_path / f"u{item[0]}.txt", item[1]),
+                    enumerate(test_strings)
+                ))
+        
+        return results
+    
+    def _unicode_roundtrip(self, path: Path, test_string: str) -> TestResult:
+        """Encode a string and round-trip it through a UTF-8 file."""
+        try:
+            encoded = test_string.encode('utf-8')
+            
+            # Test file I/O with Unicode; the file round-trip is what can actually fail
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(test_string)
+            
+            with open(path, 'r', encoding='utf-8') as f:
+                read_string = f.read()
+            
+            return TestResult(
+                f"Unicode handling: {test_string[:20]}...",
+                read_string == test_string,
+                details={
                     "original_length": len(test_string),
                     "encoded_length": len(encoded),
                     "file_io_success": read_string == test_string
-                })
-                
-            except Exception as e:
-                results.append({
-                    "test": f"Unicode handling: {test_string[:20]}...",
-                    "passed": False,
-                    "error": str(e)
-                })
-        
-        return results
+                }
+            )
+            
+        except Exception as e:
+            return TestResult(
+                f"Unicode handling: {test_string[:20]}...",
+                False,
+                error=str(e)
+            )
     
     def run_all_tests(self) -> Dict[str, Any]:
         """Run all cross-platform tests."""
+        system_info = self.get_system_info()
+        
         print(f"🌐 Cross-Platform Testing Suite")
-        print(f"System: {platform.system()} {platform.release()}")
+        print(f"System: {system_info['system']} {system_info['release']}")
         print("=" * 50)
         
         all_results = []
+        # Running totals, so the summary needs no second pass over all_results
+        passed_tests = 0
         
         # Run test suites
         test_suites = [
-            ("System Info", lambda: [{"test": "System detection", "passed": True, "info": self.get_system_info()}]),
+            ("System Info", lambda: [TestResult("System detection", True, details=system_info)]),
             ("Path Handling", self.test_path_handling),
             ("Command Execution", self.test_command_execution),
             ("File Operations", self.test_file_operations),
@@ -375,30 +543,30 @@ class CrossPlatformTester:
                 suite_results = test_func()
                 all_results.extend(suite_results)
                 
-                passed = sum(1 for r in suite_results if r.get("passed", False))
+                passed = sum(1 for r in suite_results if r.passed)
+                passed_tests += passed
                 total = len(suite_results)
                 print(f"   {passed}/{total} tests passed")
                 
             except Exception as e:
                 print(f"   ❌ Suite failed: {e}")
-                all_results.append({
-                    "test": f"{suite_name} (suite)",
-                    "passed": False,
-                    "error": str(e)
-                })
+                all_results.append(TestResult(
+                    f"{suite_name} (suite)",
+                    False,
+                    error=str(e)
+                ))
         
         # Generate summary
         total_tests = len(all_results)
-        passed_tests = sum(1 for r in all_results if r.get("passed", False))
         success_rate = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
         
         summary = {
-            "system_info": self.get_system_info(),
+            "system_info": system_info,
             "total_tests": total_tests,
             "passed_tests": passed_tests,
             "failed_tests": total_tests - passed_tests,
             "success_rate": success_rate,
-            "results": all_results
+            "results": [r.to_dict() for r in all_results]
         }
         
         print(f"\n📊 Cross-Platform Test Summary")
@@ -413,13 +581,38 @@ class CrossPlatformTester:
 
 def main():
     """Main test runner."""
+    import tempfile
+    
     tester = CrossPlatformTester()
     results = tester.run_all_tests()
     
     # Save results
-    results_file = Path(__file__).parent / f"cross_platform_results_{platform.system().lower()}.json"
-    with open(results_file, 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+    results_file = _HERE / f"cross_platform_results_{_SYSTEM_LOWER}.json"
+    if orjson is not None:
+        payload = orjson.dumps(results, default=str, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(results, indent=2, default=str).encode('utf-8')
+    
+    # Write a sibling temp file and rename it into place, so a crash never leaves partial JSON
+    f = tempfile.NamedTemporaryFile(mode='wb', dir=results_file.parent, delete=False)
+    try:
+        with f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        # NamedTemporaryFile is created owner-only; keep the existing file's mode,
+        # or the mode a plain open() would give under the current umask
+        try:
+            mode = os.stat(results_file).st_mode & 0o777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(f.name, mode)
+        os.replace(f.name, results_file)
+    except BaseException:
+        Path(f.name).unlink(missing_ok=True)
+        raise
     
     print(f"\n📄 Results saved to: {results_file}")
     